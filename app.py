@@ -1,19 +1,44 @@
+import importlib.util
 import os
 import sys
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, status
-from fastapi.middleware.cors import CORSMiddleware
+import msgspec
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import DBAPIError, DisconnectionError
 
 # Ensure local imports work when running from different directories
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-if CURRENT_DIR not in sys.path:
-    sys.path.append(CURRENT_DIR)
+# (only touch sys.path when the local modules are not already importable)
+if importlib.util.find_spec("todo_service") is None:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import settings
-from models import Task, TaskCreate, TaskUpdate, HealthResponse
-from todo_service import task_service
+from middleware import WildcardCORSMiddleware
+from models import (
+    Task, TaskCreate, TaskCreateMS, TaskIds, TaskIdsMS, TaskUpdate, TaskUpdateMS, TaskStatus, TaskStats,
+    HealthResponse
+)
+from task_store import TaskLog
+from todo_service import TaskService
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the app's task service (and its log) from startup to shutdown"""
+    service = TaskService(TaskLog(settings.task_store_path) if settings.task_store_path else None)
+    app.state.task_service = service
+    try:
+        yield
+    finally:
+        service.close()
+
+async def get_task_service(request: Request) -> TaskService:
+    """Dependency to get the app's task service, created by its lifespan (async so FastAPI doesn't use a threadpool)"""
+    return request.app.state.task_service
 
 # Create FastAPI app
 app = FastAPI(
@@ -21,79 +46,181 @@ app = FastAPI(
     version=settings.app_version,
     description="A simple Task API built with FastAPI",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # Serialize responses with orjson instead of stdlib json
+    lifespan=lifespan
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Add CORS middleware (allows any origin, method and header)
+# In production, switch back to CORSMiddleware with exact origins
+app.add_middleware(WildcardCORSMiddleware)
+
+@app.exception_handler(DisconnectionError)
+@app.exception_handler(DBAPIError)
+async def database_disconnect_handler(request: Request, exc: Exception):
+    """Ask clients to retry when a pooled DB connection turns out to be stale.
+
+    The pool discards the broken connection, so the retry gets a fresh one.
+    """
+    if isinstance(exc, DBAPIError) and not exc.connection_invalidated:
+        raise exc
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database connection lost, please retry"},
+        headers={"Retry-After": "0"}
+    )
+
+# Static part of the health payload, serialized once at import time
+_HEALTH_PREFIX = orjson.dumps({"status": "ok", "version": settings.app_version})[:-1]
+
+# Health timestamps are refreshed at most every 100ms: (monotonic time, encoded timestamp)
+_HEALTH_TS_TTL = 0.1
+_last_ts: Tuple[float, bytes] = (float("-inf"), b"")
+
+# Encoder for the service's TaskMS records (same JSON as the Task model)
+_TASK_ENCODER = msgspec.json.Encoder()
+
+class TaskResponse(Response):
+    """Render TaskMS records, or lists of them, with msgspec, skipping jsonable_encoder"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return _TASK_ENCODER.encode(content)
+
+# Request body decoders, specialized for each route's schema at import time
+_TASK_CREATE_DECODER = msgspec.json.Decoder(TaskCreateMS)
+_TASK_UPDATE_DECODER = msgspec.json.Decoder(TaskUpdateMS)
+_TASK_IDS_DECODER = msgspec.json.Decoder(TaskIdsMS)
+
+def _decode_body(decoder: msgspec.json.Decoder, body: bytes):
+    """Decode and validate a request body, mapping failures to 422"""
+    try:
+        return decoder.decode(body)
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+def _json_body(model) -> dict:
+    """OpenAPI request body for endpoints that decode their body with msgspec"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
 
 # Health endpoint
-@app.get("/health", response_model=HealthResponse, tags=["Health"])
-def health_check():
+@app.get("/health", responses={200: {"model": HealthResponse}}, tags=["Health"])
+async def health_check():
     """Health check endpoint"""
-    return HealthResponse(
-        status="ok",
-        timestamp=datetime.now(),
-        version=settings.app_version
+    global _last_ts
+    now = time.monotonic()
+    if now - _last_ts[0] > _HEALTH_TS_TTL:
+        _last_ts = (now, datetime.now().isoformat().encode())
+    return Response(
+        _HEALTH_PREFIX + b',"timestamp":"' + _last_ts[1] + b'"}',
+        media_type="application/json"
     )
 
 # Task endpoints
-@app.post("/tasks", response_model=Task, status_code=status.HTTP_201_CREATED, tags=["Tasks"])
-def create_task(task_data: TaskCreate):
+# Services return already-validated models, so response_model is only used for docs
+@app.post(
+    "/tasks",
+    status_code=status.HTTP_201_CREATED,
+    responses={201: {"model": Task}},
+    openapi_extra=_json_body(TaskCreate),
+    tags=["Tasks"]
+)
+async def create_task(request: Request, service: TaskService = Depends(get_task_service)):
     """Create a new task"""
+    body = _decode_body(_TASK_CREATE_DECODER, await request.body())
+    
     try:
-        task = task_service.create_task(task_data)
-        return task
+        task_data = TaskCreate.model_construct(title=body.title, description=body.description)
+        task = service.create_task(task_data)
+        return TaskResponse(task, status_code=status.HTTP_201_CREATED)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create task: {str(e)}"
         )
 
-@app.get("/tasks", response_model=List[Task], tags=["Tasks"])
-def list_tasks():
+@app.get("/tasks", responses={200: {"model": List[Task]}}, tags=["Tasks"])
+async def list_tasks(
+    status_filter: Optional[TaskStatus] = Query(None, alias="status", description="Filter by task status"),
+    search: Optional[str] = Query(None, description="Search in title and description"),
+    service: TaskService = Depends(get_task_service)
+):
     """List all tasks"""
     try:
-        tasks = task_service.list_tasks()
-        return tasks
+        tasks = service.list_tasks(status=status_filter, search=search)
+        return TaskResponse(tasks)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve tasks: {str(e)}"
         )
 
-@app.get("/tasks/{task_id}", response_model=Task, tags=["Tasks"])
-def get_task(task_id: int):
+@app.get("/tasks/stats", responses={200: {"model": TaskStats}}, tags=["Tasks"])
+async def get_task_stats(service: TaskService = Depends(get_task_service)):
+    """Get task statistics"""
+    return ORJSONResponse(service.get_stats())
+
+@app.get("/tasks/{task_id}", responses={200: {"model": Task}}, tags=["Tasks"])
+async def get_task(task_id: int, service: TaskService = Depends(get_task_service)):
     """Get a specific task by ID"""
-    task = task_service.get_task(task_id)
+    task = service.get_task(task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with id {task_id} not found"
         )
-    return task
+    return TaskResponse(task)
 
-@app.put("/tasks/{task_id}", response_model=Task, tags=["Tasks"])
-def update_task(task_id: int, updates: TaskUpdate):
+@app.put(
+    "/tasks/{task_id}",
+    responses={200: {"model": Task}},
+    openapi_extra=_json_body(TaskUpdate),
+    tags=["Tasks"]
+)
+async def update_task(task_id: int, request: Request, service: TaskService = Depends(get_task_service)):
     """Update an existing task"""
-    task = task_service.update_task(task_id, updates)
+    body = _decode_body(_TASK_UPDATE_DECODER, await request.body())
+    # Only the fields present in the body count as set (same as exclude_unset)
+    updates = TaskUpdate.model_construct(**{
+        field: value for field, value in msgspec.structs.asdict(body).items()
+        if value is not msgspec.UNSET
+    })
+    task = service.update_task(task_id, updates)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with id {task_id} not found"
         )
-    return task
+    return TaskResponse(task)
+
+@app.post(
+    "/tasks/done",
+    responses={200: {"model": List[Task]}},
+    openapi_extra=_json_body(TaskIds),
+    tags=["Tasks"]
+)
+async def mark_tasks_done(request: Request, service: TaskService = Depends(get_task_service)):
+    """Mark several tasks as done, returning the tasks that changed"""
+    body = _decode_body(_TASK_IDS_DECODER, await request.body())
+    return TaskResponse(service.mark_done(body.ids))
+
+@app.delete("/tasks/done", tags=["Tasks"])
+def clear_done_tasks(service: TaskService = Depends(get_task_service)):
+    """Delete all done tasks"""
+    return {"deleted": service.clear_done()}
 
 @app.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Tasks"])
-def delete_task(task_id: int):
+def delete_task(task_id: int, service: TaskService = Depends(get_task_service)):
     """Delete a task"""
-    success = task_service.delete_task(task_id)
+    success = service.delete_task(task_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -106,5 +233,7 @@ if __name__ == "__main__":
         "app:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop",      # Fail loudly if uvicorn[standard] extras are missing
+        http="httptools"
     )
\ No newline at end of file
@@ -1,4 +1,6 @@
 import os
+from dataclasses import make_dataclass
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
@@ -27,6 +29,12 @@ class Settings(BaseSettings):
     mysql_user: str = "root"
     mysql_password: str = ""
     mysql_database: str = "todo_db"
+    # Connection pool sizing (match the expected request concurrency per worker)
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    
+    # Optional append-only task log; tasks are kept only in memory when unset
+    task_store_path: Optional[str] = None
     
     # Environment
     environment: str = "development"
@@ -36,5 +44,29 @@ class Settings(BaseSettings):
         """Construct MySQL connection URL"""
         return f"mysql+pymysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
 
+    @property
+    def mysql_async_url(self) -> str:
+        """Construct MySQL connection URL for the async (aiomysql) driver"""
+        return f"mysql+aiomysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
+
+# Immutable snapshot of Settings (including derived URLs) with slot-based attribute access
+FrozenSettings = make_dataclass(
+    "FrozenSettings",
+    [(name, field.annotation) for name, field in Settings.model_fields.items()]
+    + [("mysql_url", str), ("mysql_async_url", str)],
+    frozen=True,
+    slots=True,
+)
+
+@lru_cache(maxsize=None)
+def get_settings() -> FrozenSettings:
+    """Resolve the settings once and freeze them"""
+    resolved = Settings()
+    return FrozenSettings(
+        **resolved.model_dump(),
+        mysql_url=resolved.mysql_url,
+        mysql_async_url=resolved.mysql_async_url
+    )
+
 # Global settings instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
\ No newline at end of file
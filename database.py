@@ -5,21 +5,38 @@ To activate MySQL integration, follow these steps:
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from database_models import Base
 from config import settings
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
-# Create engine
+# DATABASE_URL overrides the URL built from the MYSQL_* settings
+DATABASE_URL = settings.database_url or settings.mysql_url
+
+# Create engine (sync, used for table creation and migrations)
 engine = create_engine(
-    settings.mysql_url,
-    pool_pre_ping=True,  # Verify connections before use
+    DATABASE_URL,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    # No pool_pre_ping: PyMySQL/aiomysql sockets use SO_KEEPALIVE, so stale
+    # connections are caught by TCP and recycling instead of a SELECT 1 per checkout
     pool_recycle=300,    # Recycle connections every 5 minutes
     echo=settings.debug  # Log SQL queries in debug mode
 )
 
-# Create session factory
+# Create async engine (used by request handlers, no threadpool hop for DB I/O)
+async_engine = create_async_engine(
+    settings.mysql_async_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=300,
+    echo=settings.debug
+)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 def create_tables():
     """Create all tables in the database"""
@@ -33,6 +50,11 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 """
 MYSQL ACTIVATION GUIDE FOR MYSQL WORKBENCH USERS:
 
@@ -63,7 +85,7 @@ MYSQL ACTIVATION GUIDE FOR MYSQL WORKBENCH USERS:
 
 5. Install additional dependencies:
    ```bash
-   pip install alembic
+   pip install alembic aiomysql
    ```
 
 6. Initialize Alembic (database migrations):
@@ -90,36 +112,37 @@ MYSQL ACTIVATION GUIDE FOR MYSQL WORKBENCH USERS:
 Example updated todo_service.py methods:
 
 ```python
-from sqlalchemy.orm import Session
-from database_models import TodoDB, TodoStatusEnum, TodoPriorityEnum
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database_models import TodoDB, TodoPriorityEnum, TODO_STATUS_LABELS, TODO_PRIORITY_LABELS
 
 class TodoService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create_todo(self, todo_data: TodoCreate) -> Todo:
+    async def create_todo(self, todo_data: TodoCreate) -> Todo:
         db_todo = TodoDB(
             title=todo_data.title,
             description=todo_data.description,
-            priority=TodoPriorityEnum(todo_data.priority)
+            priority=TodoPriorityEnum.from_label(todo_data.priority)
         )
         self.db.add(db_todo)
-        self.db.commit()
-        self.db.refresh(db_todo)
+        await self.db.commit()
+        await self.db.refresh(db_todo)
         return self._convert_to_pydantic(db_todo)
     
-    def get_todo(self, todo_id: int) -> Optional[Todo]:
-        db_todo = self.db.query(TodoDB).filter(TodoDB.id == todo_id).first()
+    async def get_todo(self, todo_id: int) -> Optional[Todo]:
+        db_todo = await self.db.scalar(select(TodoDB).where(TodoDB.id == todo_id))
         return self._convert_to_pydantic(db_todo) if db_todo else None
     
     def _convert_to_pydantic(self, db_todo: TodoDB) -> Todo:
-        return Todo(
+        # Rows come from our own database, so skip re-validation
+        return Todo.model_construct(
             id=db_todo.id,
             title=db_todo.title,
             description=db_todo.description,
-            status=db_todo.status.value,
-            priority=db_todo.priority.value,
+            status=TODO_STATUS_LABELS[db_todo.status],
+            priority=TODO_PRIORITY_LABELS[db_todo.priority],
             created_at=db_todo.created_at,
             updated_at=db_todo.updated_at
         )
@@ -128,11 +151,11 @@ class TodoService:
 11. Update app.py endpoints to inject database dependency:
 
 ```python
-from database import get_db
+from database import get_async_db
 
 @app.post("/todos", response_model=Todo)
-def create_todo(todo_data: TodoCreate, db: Session = Depends(get_db)):
+async def create_todo(todo_data: TodoCreate, db: AsyncSession = Depends(get_async_db)):
     service = TodoService(db)
-    return service.create_todo(todo_data)
+    return await service.create_todo(todo_data)
 ```
 """
\ No newline at end of file
@@ -5,22 +5,44 @@ This file contains the SQLAlchemy models that correspond to the Pydantic models.
 Uncomment and use these when you want to integrate with MySQL.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, DateTime, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 import enum
 
 Base = declarative_base()
 
-class TodoStatusEnum(enum.Enum):
-    PENDING = "pending"
-    IN_PROGRESS = "in_progress"
-    COMPLETED = "completed"
+# API labels indexed by the stored integer code
+TODO_STATUS_LABELS = ("pending", "in_progress", "completed")
+TODO_PRIORITY_LABELS = ("low", "medium", "high")
 
-class TodoPriorityEnum(enum.Enum):
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
+class TodoStatusEnum(enum.IntEnum):
+    """Status codes stored as SMALLINT (smaller rows and index entries than string labels)"""
+    PENDING = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+
+    @property
+    def label(self) -> str:
+        return TODO_STATUS_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "TodoStatusEnum":
+        return cls(TODO_STATUS_LABELS.index(label))
+
+class TodoPriorityEnum(enum.IntEnum):
+    """Priority codes stored as SMALLINT"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+    @property
+    def label(self) -> str:
+        return TODO_PRIORITY_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "TodoPriorityEnum":
+        return cls(TODO_PRIORITY_LABELS.index(label))
 
 class TodoDB(Base):
     """SQLAlchemy model for Todo table"""
@@ -29,13 +51,13 @@ class TodoDB(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String(200), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    status = Column(Enum(TodoStatusEnum), default=TodoStatusEnum.PENDING, nullable=False, index=True)
-    priority = Column(Enum(TodoPriorityEnum), default=TodoPriorityEnum.MEDIUM, nullable=False, index=True)
+    status = Column(SmallInteger, default=TodoStatusEnum.PENDING, nullable=False, index=True)
+    priority = Column(SmallInteger, default=TodoPriorityEnum.MEDIUM, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     def __repr__(self):
-        return f"<Todo(id={self.id}, title='{self.title}', status='{self.status.value}')>"
+        return f"<Todo(id={self.id}, title='{self.title}', status='{TODO_STATUS_LABELS[self.status]}')>"
 
 """
 Usage example when integrating with MySQL:
@@ -60,7 +82,7 @@ def create_todo_db(db: Session, todo_data: TodoCreate) -> TodoDB:
     db_todo = TodoDB(
         title=todo_data.title,
         description=todo_data.description,
-        priority=TodoPriorityEnum(todo_data.priority)
+        priority=TodoPriorityEnum.from_label(todo_data.priority)
     )
     db.add(db_todo)
     db.commit()
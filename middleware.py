@@ -0,0 +1,84 @@
+"""
+Minimal ASGI CORS middleware for the wildcard configuration used by the API
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALLOW_METHODS = (b"DELETE", b"GET", b"HEAD", b"OPTIONS", b"PATCH", b"POST", b"PUT")
+
+# Headers appended to every cross-origin response
+SIMPLE_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-credentials", b"true"),
+]
+
+# Static part of the preflight response headers
+PREFLIGHT_HEADERS = [
+    (b"vary", b"Origin"),
+    (b"access-control-allow-methods", b", ".join(ALLOW_METHODS)),
+    (b"access-control-max-age", b"600"),
+    (b"access-control-allow-credentials", b"true"),
+    (b"content-type", b"text/plain; charset=utf-8"),
+]
+
+class WildcardCORSMiddleware:
+    """CORS for allow_origins/methods/headers=["*"] with credentials.
+
+    Equivalent to Starlette's CORSMiddleware for that configuration, but with
+    precomputed headers instead of per-request origin/header matching.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        origin = headers.get(b"origin")
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and b"access-control-request-method" in headers:
+            await self._preflight(origin, headers, send)
+            return
+
+        # Credentialed requests must get the explicit origin instead of "*"
+        if b"cookie" in headers:
+            extra_headers = [
+                (b"access-control-allow-origin", origin),
+                (b"access-control-allow-credentials", b"true"),
+                (b"vary", b"Origin"),
+            ]
+        else:
+            extra_headers = SIMPLE_HEADERS
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    @staticmethod
+    async def _preflight(origin: bytes, headers: dict, send: Send) -> None:
+        """Answer a CORS preflight request directly"""
+        if headers[b"access-control-request-method"] in ALLOW_METHODS:
+            status_code, body = 200, b"OK"
+        else:
+            status_code, body = 400, b"Disallowed CORS method"
+
+        response_headers = [
+            *PREFLIGHT_HEADERS,
+            (b"access-control-allow-origin", origin),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        requested_headers = headers.get(b"access-control-request-headers")
+        if requested_headers is not None:
+            response_headers.append((b"access-control-allow-headers", requested_headers))
+
+        await send({"type": "http.response.start", "status": status_code, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
@@ -1,9 +1,14 @@
-from typing import Optional, List, Literal
+import sys
+from typing import Optional, List, Literal, Dict, Annotated, Tuple, Union, get_args
 from datetime import datetime
+import msgspec
 from pydantic import BaseModel, Field, ConfigDict
 
 # Status enum simplificado
 TaskStatus = Literal["pending", "in_progress", "done"]
+# Interned status values, so comparisons against stored statuses hit the identity fast path
+TASK_STATUSES: Tuple[str, ...] = tuple(sys.intern(s) for s in get_args(TaskStatus))
+STATUS_PENDING, STATUS_IN_PROGRESS, STATUS_DONE = TASK_STATUSES
 
 # Constants to avoid string duplication
 TASK_TITLE_DESCRIPTION = "Task title"
@@ -23,6 +28,11 @@ class TaskCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description=TASK_TITLE_DESCRIPTION)
     description: Optional[str] = Field(None, max_length=1000, description=TASK_DESCRIPTION_DESCRIPTION)
 
+class TaskCreateMS(msgspec.Struct):
+    """msgspec mirror of TaskCreate, used to decode and validate request bodies in one pass"""
+    title: Annotated[str, msgspec.Meta(min_length=1, max_length=200)]
+    description: Optional[Annotated[str, msgspec.Meta(max_length=1000)]] = None
+
 class TaskUpdate(BaseModel):
     """Schema for updating an existing task"""
     model_config = ConfigDict(
@@ -39,6 +49,12 @@ class TaskUpdate(BaseModel):
     description: Optional[str] = Field(None, max_length=1000, description=TASK_DESCRIPTION_DESCRIPTION)
     status: Optional[TaskStatus] = Field(None, description="Task status")
 
+class TaskUpdateMS(msgspec.Struct):
+    """msgspec mirror of TaskUpdate; omitted fields stay UNSET"""
+    title: Union[Annotated[str, msgspec.Meta(min_length=1, max_length=200)], None, msgspec.UnsetType] = msgspec.UNSET
+    description: Union[Annotated[str, msgspec.Meta(max_length=1000)], None, msgspec.UnsetType] = msgspec.UNSET
+    status: Union[TaskStatus, None, msgspec.UnsetType] = msgspec.UNSET
+
 class Task(BaseModel):
     """Complete Task model"""
     model_config = ConfigDict(
@@ -57,6 +73,32 @@ class Task(BaseModel):
     description: Optional[str] = Field(None, description=TASK_DESCRIPTION_DESCRIPTION)
     status: TaskStatus = Field(default="pending", description="Task status")
 
+class TaskIds(BaseModel):
+    """Schema for bulk operations on a set of tasks"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {"ids": [1, 2, 3]}
+        }
+    )
+    
+    ids: List[int] = Field(..., description="Task identifiers")
+
+class TaskIdsMS(msgspec.Struct):
+    """msgspec mirror of TaskIds"""
+    ids: List[int]
+
+class TaskMS(msgspec.Struct, gc=False):
+    """Slotted in-memory task record; mirrors Task and encodes to the same JSON"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    status: TaskStatus = "pending"
+
+class TaskStats(BaseModel):
+    """Task statistics"""
+    total: int = Field(..., description="Total number of tasks")
+    by_status: Dict[str, int] = Field(..., description="Number of tasks per status")
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str = "ok"
@@ -0,0 +1,90 @@
+"""
+Append-only task log with fixed-size records
+
+Every create/update/delete appends one record; on startup the file is mapped
+with mmap and replayed (last record for an id wins), so no JSON or Pydantic
+parsing happens at load time.
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterator, Optional, Tuple
+
+from models import TASK_STATUSES
+
+# Field sizes in bytes (UTF-8 needs up to 4 bytes per character)
+TITLE_SIZE = 200 * 4
+DESCRIPTION_SIZE = 1000 * 4
+
+# id, flags, status code, title length, description length, title, description
+RECORD = struct.Struct(f"<IBBHH{TITLE_SIZE}s{DESCRIPTION_SIZE}s")
+
+FLAG_DELETED = 1
+FLAG_HAS_DESCRIPTION = 2
+
+# (id, deleted, status, title, description)
+TaskRecord = Tuple[int, bool, str, str, Optional[str]]
+
+class TaskLog:
+    """Durable append-only log of task records"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab")
+
+    def replay(self) -> Iterator[TaskRecord]:
+        """Yield every record in the log, oldest first"""
+        size = os.path.getsize(self.path)
+        size -= size % RECORD.size  # Ignore a torn trailing write
+        if size == 0:
+            return
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)[:size]
+            try:
+                for task_id, flags, status_code, title_len, desc_len, title, desc in RECORD.iter_unpack(view):
+                    description = desc[:desc_len].decode() if flags & FLAG_HAS_DESCRIPTION else None
+                    yield (
+                        task_id,
+                        bool(flags & FLAG_DELETED),
+                        TASK_STATUSES[status_code],
+                        title[:title_len].decode(),
+                        description
+                    )
+            finally:
+                view.release()
+
+    def truncate(self) -> None:
+        """Remove every record from the log"""
+        self._file.truncate(0)
+        self._sync()
+
+    def close(self) -> None:
+        """Close the underlying file"""
+        self._file.close()
+
+    @staticmethod
+    def pack(task_id: int, status: str, title: str, description: Optional[str]) -> bytes:
+        """Encode the state of a task as one record, without writing it"""
+        title_bytes = title.encode()
+        desc_bytes = description.encode() if description is not None else b""
+        flags = FLAG_HAS_DESCRIPTION if description is not None else 0
+        return RECORD.pack(
+            task_id, flags, TASK_STATUSES.index(status),
+            len(title_bytes), len(desc_bytes), title_bytes, desc_bytes
+        )
+
+    @staticmethod
+    def pack_delete(*task_ids: int) -> bytes:
+        """Encode the deletion of one or more tasks, without writing it"""
+        return b"".join(RECORD.pack(i, FLAG_DELETED, 0, 0, 0, b"", b"") for i in task_ids)
+
+    def write(self, records: bytes) -> None:
+        """Append already-packed records with a single fsync"""
+        self._file.write(records)
+        self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
@@ -7,25 +7,149 @@ ROOT = pathlib.Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+import asyncio
+import os
+
 import pytest
+import pytest_asyncio
+
+from models import TaskCreate, TaskUpdate
 from todo_service import TaskService
 
+# The app, its test clients and the DB modules are imported inside the fixtures
+# that need them, so service/store/config tests don't pay for those imports
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """In-memory SQLite engine with the schema created once per test session"""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import StaticPool
+    from database_models import Base
+    
+    # Each pytest-xdist worker gets its own named in-memory DB
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    # StaticPool keeps a single connection so every session sees the same DB
+    engine = create_engine(
+        f"sqlite:///file:memdb_{worker_id}?mode=memory&cache=shared&uri=true",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with pysqlite
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db_session(db_engine):
+    """Per-test session inside an outer transaction that is rolled back afterwards.
+
+    Commits made by the code under test only release SAVEPOINTs, so each test
+    starts from the empty schema without dropping or deleting anything.
+    """
+    from sqlalchemy.orm import Session
+    import database
+    from app import app
+    
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+    def _get_test_db():
+        yield session
+
+    app.dependency_overrides[database.get_db] = _get_test_db
+    yield session
+    app.dependency_overrides.pop(database.get_db, None)
+    session.close()
+    transaction.rollback()
+    connection.close()
+
 @pytest.fixture
-def clean_service():
-    """Create a fresh TaskService instance for each test"""
+def seed_todos(db_session):
+    """Insert TodoDB rows with a single bulk INSERT and one commit"""
+    from database_models import TodoDB
+    
+    def _seed(items):
+        db_session.bulk_insert_mappings(TodoDB, items)
+        db_session.commit()
+    return _seed
+
+@pytest.fixture
+def seed_tasks(clean_app):
+    """Create tasks directly in the app's service, skipping HTTP round-trips"""
+    task_service = clean_app
+    
+    def _seed(*specs):
+        tasks = []
+        for spec in specs:
+            task = task_service.create_task(
+                TaskCreate.model_construct(title=spec["title"], description=spec.get("description"))
+            )
+            if "status" in spec:
+                task_service.update_task(task.id, TaskUpdate.model_construct(status=spec["status"]))
+            tasks.append(task)
+        return tasks
+    return _seed
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """Session-wide event loop so async fixtures can be session scoped"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def _app_client():
+    """Synchronous test client shared by the whole session; keeps the app's lifespan running"""
+    from fastapi.testclient import TestClient
+    from app import app
+    
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def client(_app_client):
+    """Test client whose app starts each test with no tasks"""
+    _app_client.app.state.task_service.clear()
+    return _app_client
+
+@pytest.fixture(scope="session")
+def asgi_transport():
+    """Single ASGI transport reused by every async client"""
+    from httpx import ASGITransport
+    from app import app
+    
+    return ASGITransport(app=app)
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client(asgi_transport, _app_client):
+    """Async test client shared by the whole session (the app's lifespan runs via _app_client)"""
+    from httpx import AsyncClient
+    
+    async with AsyncClient(transport=asgi_transport, base_url="http://test") as c:
+        yield c
+
+@pytest.fixture(scope="module")
+def _service():
+    """TaskService shared by the tests of a module"""
     return TaskService()
 
-@pytest.fixture(autouse=True)
-def reset_global_service():
-    """Reset the global task_service before each test"""
-    from todo_service import task_service
-    task_service._tasks.clear()
-    task_service._next_id = 1
-
-@pytest.fixture  
-def clean_app():
-    """Provide a clean app state for each test"""
-    from todo_service import task_service
-    task_service._tasks.clear()
-    task_service._next_id = 1
-    return task_service
\ No newline at end of file
+@pytest.fixture
+def clean_service(_service):
+    """Provide an empty TaskService for each test, reset instead of rebuilt"""
+    _service.clear()
+    return _service
+
+@pytest.fixture
+def clean_app(client):
+    """Provide the app's task service, emptied for each test"""
+    return client.app.state.task_service
\ No newline at end of file
@@ -1,204 +1,340 @@
 """
 Tests for the FastAPI application endpoints
 """
+from dataclasses import replace
+
+import orjson
 import pytest
-from unittest.mock import patch, Mock
-from httpx import AsyncClient
-from app import app
+from sqlalchemy.exc import DisconnectionError
+from app import app, get_task_service
+from config import settings
+from fastapi.testclient import TestClient
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Request bodies serialized once instead of per request through httpx's json=
+TASK = orjson.dumps({"title": "Test Task"})
+TASK_1 = orjson.dumps({"title": "Task 1"})
+TASK_ORIGINAL = orjson.dumps({"title": "Original Title"})
+TASK_ORIGINAL_WITH_DESCRIPTION = orjson.dumps({"title": "Original Title", "description": "Keep me"})
+TASK_TO_DELETE = orjson.dumps({"title": "To Delete"})
+UPDATE_FULL = orjson.dumps({
+    "title": "Updated Title",
+    "description": "New description",
+    "status": "in_progress"
+})
+UPDATE_TITLE = orjson.dumps({"title": "Updated"})
+UPDATE_STATUS_DONE = orjson.dumps({"status": "done"})
+UPDATE_STATUS_INVALID = orjson.dumps({"status": "archived"})
+UPDATE_NULL_TITLE = orjson.dumps({"title": None})
+MARK_DONE = orjson.dumps({"ids": [1, 3]})
+
+class FailingService:
+    """Task service stand-in whose every operation raises the given error"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def __getattr__(self, name):
+        def _fail(*args, **kwargs):
+            raise self.error
+        return _fail
+
+@pytest.fixture
+def override_service():
+    """Swap the task service dependency for the duration of a test"""
+    def _override(service):
+        app.dependency_overrides[get_task_service] = lambda: service
+    try:
+        yield _override
+    finally:
+        app.dependency_overrides.pop(get_task_service, None)
+
+def _json(response):
+    """Decode a response body with orjson"""
+    return orjson.loads(response.content)
 
 class TestTaskAPI:
-    @pytest.mark.asyncio
-    async def test_create_task(self):
+    @pytest.mark.parametrize("payload,expected", [
+        (
+            orjson.dumps({"title": "Test Task", "description": "Test Description"}),
+            {"id": 1, "title": "Test Task", "description": "Test Description", "status": "pending"}
+        ),
+        (
+            orjson.dumps({"title": "Minimal Task"}),
+            {"id": 1, "title": "Minimal Task", "description": None, "status": "pending"}
+        ),
+        # TaskCreate has no status field, so a status in the body is ignored
+        (
+            orjson.dumps({"title": "Test Task", "status": "invalid_status"}),
+            {"id": 1, "title": "Test Task", "description": None, "status": "pending"}
+        ),
+    ], ids=["full", "minimal", "ignored_status"])
+    def test_create_task(self, client, payload, expected):
         """Test creating a new task"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post("/tasks", json={
-                "title": "Test Task",
-                "description": "Test Description"
-            })
+        response = client.post("/tasks", content=payload, headers=JSON_HEADERS)
         
         assert response.status_code == 201
-        data = response.json()
-        assert data["id"] == 1
-        assert data["title"] == "Test Task"
-        assert data["description"] == "Test Description"
-        assert data["status"] == "pending"
+        assert _json(response) == expected
     
-    @pytest.mark.asyncio
-    async def test_create_task_minimal(self):
-        """Test creating a task with minimal data"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post("/tasks", json={
-                "title": "Minimal Task"
-            })
+    @pytest.mark.parametrize("body", [
+        b'{"title": ""}',
+        b'{"description": "No title"}',
+        b"{not json",
+    ], ids=["empty_title", "missing_title", "malformed"])
+    def test_create_task_invalid_body(self, client, body):
+        """Test creating a task with an invalid body"""
+        response = client.post("/tasks", content=body, headers=JSON_HEADERS)
         
-        assert response.status_code == 201
-        data = response.json()
-        assert data["title"] == "Minimal Task"
-        assert data["description"] is None
-        assert data["status"] == "pending"
-    
-    @pytest.mark.asyncio
-    async def test_create_task_invalid_status(self):
-        """Test creating a task with invalid status"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post("/tasks", json={
-                "title": "Test Task",
-                "status": "invalid_status"
-            })
-        
-        # The task is created with the invalid status value since we don't validate in TaskCreate
-        # This test shows the behavior - in a real app you might want stricter validation
-        assert response.status_code == 201
+        assert response.status_code == 422
     
-    @pytest.mark.asyncio
-    async def test_list_tasks_empty(self, clean_app):
+    def test_list_tasks_empty(self, clean_app, client):
         """Test listing tasks when none exist"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/tasks")
+        response = client.get("/tasks")
         
         assert response.status_code == 200
-        assert response.json() == []
+        assert _json(response) == []
     
-    @pytest.mark.asyncio
-    async def test_list_tasks_with_data(self, clean_app):
+    def test_list_tasks_with_data(self, clean_app, client, seed_tasks):
         """Test listing tasks with data"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            # Create tasks
-            await client.post("/tasks", json={"title": "Task 1"})
-            await client.post("/tasks", json={"title": "Task 2"})
-            
-            response = await client.get("/tasks")
+        seed_tasks({"title": "Task 1"}, {"title": "Task 2"})
+        
+        response = client.get("/tasks")
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert len(data) == 2
     
+    def test_list_tasks_with_filters(self, clean_app, client, seed_tasks):
+        """Test listing tasks filtered by status and search"""
+        seed_tasks({"title": "Write docs", "status": "done"}, {"title": "Write tests"})
+        
+        response = client.get("/tasks", params={"status": "done", "search": "write"})
+        
+        assert response.status_code == 200
+        data = _json(response)
+        assert len(data) == 1
+        assert data[0]["title"] == "Write docs"
+    
+    def test_list_tasks_fast_path_bytes(self, clean_app, client, seed_tasks):
+        """Test that list responses are the exact compact JSON of the tasks"""
+        seed_tasks({"title": "Task 1", "description": "Ñandú"}, {"title": "Task 2"})
+        
+        response = client.get("/tasks")
+        
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == orjson.dumps([
+            {"id": 1, "title": "Task 1", "description": "Ñandú", "status": "pending"},
+            {"id": 2, "title": "Task 2", "description": None, "status": "pending"},
+        ])
+    
+    def test_get_task_fast_path_bytes(self, clean_app, client):
+        """Test that single-task responses are rendered straight from the model"""
+        client.post("/tasks", content=TASK_1, headers=JSON_HEADERS)
+        
+        response = client.get("/tasks/1")
+        
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == orjson.dumps(
+            {"id": 1, "title": "Task 1", "description": None, "status": "pending"}
+        )
+    
     @pytest.mark.asyncio
-    async def test_get_task_exists(self, clean_app):
+    async def test_get_task_async(self, async_client):
+        """Test creating and fetching a task through the async client"""
+        create_response = await async_client.post("/tasks", content=TASK, headers=JSON_HEADERS)
+        
+        response = await async_client.get(f"/tasks/{_json(create_response)['id']}")
+        
+        assert response.status_code == 200
+        assert _json(response)["title"] == "Test Task"
+    
+    def test_get_task_stats(self, clean_app, client, seed_tasks):
+        """Test task statistics endpoint"""
+        seed_tasks({"title": "Task 1"}, {"title": "Task 2"})
+        
+        response = client.get("/tasks/stats")
+        
+        assert response.status_code == 200
+        data = _json(response)
+        assert data["total"] == 2
+        assert data["by_status"] == {"pending": 2, "in_progress": 0, "done": 0}
+    
+    def test_get_task_exists(self, clean_app, client):
         """Test getting an existing task"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            # Create a task
-            create_response = await client.post("/tasks", json={"title": "Test Task"})
-            task_id = create_response.json()["id"]
+        # Create a task
+        create_response = client.post("/tasks", content=TASK, headers=JSON_HEADERS)
+        task_id = _json(create_response)["id"]
             
-            response = await client.get(f"/tasks/{task_id}")
+        response = client.get(f"/tasks/{task_id}")
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["id"] == task_id
         assert data["title"] == "Test Task"
     
-    @pytest.mark.asyncio
-    async def test_get_task_not_exists(self, clean_app):
+    def test_get_task_not_exists(self, client):
         """Test getting a non-existent task"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/tasks/999")
+        response = client.get("/tasks/999")
         
         assert response.status_code == 404
-        assert "Task with id 999 not found" in response.json()["detail"]
+        assert b"Task with id 999 not found" in response.content
     
-    @pytest.mark.asyncio
-    async def test_update_task(self, clean_app):
+    def test_update_task(self, clean_app, client):
         """Test updating an existing task"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            # Create a task
-            create_response = await client.post("/tasks", json={"title": "Original Title"})
-            task_id = create_response.json()["id"]
+        # Create a task
+        create_response = client.post("/tasks", content=TASK_ORIGINAL, headers=JSON_HEADERS)
+        task_id = _json(create_response)["id"]
             
-            # Update the task
-            response = await client.put(f"/tasks/{task_id}", json={
-                "title": "Updated Title",
-                "description": "New description",
-                "status": "in_progress"
-            })
+        # Update the task
+        response = client.put(f"/tasks/{task_id}", content=UPDATE_FULL, headers=JSON_HEADERS)
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["title"] == "Updated Title"
         assert data["description"] == "New description"
         assert data["status"] == "in_progress"
     
-    @pytest.mark.asyncio
-    async def test_update_task_not_exists(self, clean_app):
+    def test_update_task_partial(self, clean_app, client):
+        """Test that fields missing from the update body are left unchanged"""
+        create_response = client.post("/tasks", content=TASK_ORIGINAL_WITH_DESCRIPTION, headers=JSON_HEADERS)
+        task_id = _json(create_response)["id"]
+            
+        response = client.put(f"/tasks/{task_id}", content=UPDATE_STATUS_DONE, headers=JSON_HEADERS)
+        invalid_response = client.put(f"/tasks/{task_id}", content=UPDATE_STATUS_INVALID, headers=JSON_HEADERS)
+        
+        assert response.status_code == 200
+        data = _json(response)
+        assert data["title"] == "Original Title"
+        assert data["description"] == "Keep me"
+        assert data["status"] == "done"
+        assert invalid_response.status_code == 422
+    
+    def test_update_task_null_title(self, clean_app, client):
+        """Test that a null title in the update body leaves the title unchanged"""
+        client.post("/tasks", content=TASK, headers=JSON_HEADERS)
+        
+        response = client.put("/tasks/1", content=UPDATE_NULL_TITLE, headers=JSON_HEADERS)
+        
+        assert response.status_code == 200
+        assert _json(response)["title"] == "Test Task"
+    
+    def test_update_task_not_exists(self, client):
         """Test updating a non-existent task"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.put("/tasks/999", json={"title": "Updated"})
+        response = client.put("/tasks/999", content=UPDATE_TITLE, headers=JSON_HEADERS)
         
         assert response.status_code == 404
-        assert "Task with id 999 not found" in response.json()["detail"]
+        assert b"Task with id 999 not found" in response.content
     
-    @pytest.mark.asyncio
-    async def test_delete_task(self, clean_app):
+    def test_delete_task(self, clean_app, client):
         """Test deleting an existing task"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            # Create a task
-            create_response = await client.post("/tasks", json={"title": "To Delete"})
-            task_id = create_response.json()["id"]
+        # Create a task
+        create_response = client.post("/tasks", content=TASK_TO_DELETE, headers=JSON_HEADERS)
+        task_id = _json(create_response)["id"]
             
-            # Delete the task
-            response = await client.delete(f"/tasks/{task_id}")
-            assert response.status_code == 204
+        # Delete the task
+        response = client.delete(f"/tasks/{task_id}")
+        assert response.status_code == 204
             
-            # Verify it's deleted
-            get_response = await client.get(f"/tasks/{task_id}")
-            assert get_response.status_code == 404
+        # Verify it's deleted
+        get_response = client.get(f"/tasks/{task_id}")
+        assert get_response.status_code == 404
     
-    @pytest.mark.asyncio
-    async def test_delete_task_not_exists(self, clean_app):
+    def test_delete_task_not_exists(self, client):
         """Test deleting a non-existent task"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.delete("/tasks/999")
+        response = client.delete("/tasks/999")
         
         assert response.status_code == 404
 
-    @pytest.mark.asyncio
-    async def test_health_endpoint(self):
+    def test_mark_tasks_done(self, clean_app, client, seed_tasks):
+        """Test marking several tasks as done in one request"""
+        seed_tasks({"title": "Task 1"}, {"title": "Task 2"}, {"title": "Task 3"})
+        
+        response = client.post("/tasks/done", content=MARK_DONE, headers=JSON_HEADERS)
+        
+        assert response.status_code == 200
+        assert [t["id"] for t in _json(response)] == [1, 3]
+        assert all(t["status"] == "done" for t in _json(response))
+    
+    def test_clear_done_tasks(self, clean_app, client, seed_tasks):
+        """Test deleting all done tasks"""
+        seed_tasks({"title": "Done Task", "status": "done"}, {"title": "Pending Task"})
+        
+        response = client.delete("/tasks/done")
+        list_response = client.get("/tasks")
+        
+        assert response.status_code == 200
+        assert _json(response) == {"deleted": 1}
+        assert [t["title"] for t in _json(list_response)] == ["Pending Task"]
+
+    def test_health_endpoint(self, client):
         """Test health check endpoint"""
-        from httpx import ASGITransport
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/health")
+        response = client.get("/health")
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["status"] == "ok"
         assert "timestamp" in data
-        assert "version" in data
+        assert data["version"] == settings.app_version
+        assert response.headers["content-type"] == "application/json"
+
+    def test_lifespan_owns_task_service(self, client, monkeypatch, tmp_path):
+        """Test that each lifespan serves its own service, replayed from and closing the task log"""
+        import app as app_module
+        monkeypatch.setattr(app_module, "settings", replace(settings, task_store_path=str(tmp_path / "tasks.log")))
+        # The session client's service is put back once the nested lifespans are done
+        monkeypatch.setattr(app.state, "task_service", app.state.task_service)
+        
+        with TestClient(app) as first:
+            service = app.state.task_service
+            assert first.post("/tasks", content=TASK, headers=JSON_HEADERS).status_code == 201
+            assert [t.title for t in service.list_tasks()] == ["Test Task"]
+        assert service._log._file.closed
+        
+        # A restarted app gets a fresh service that replays the log and can still write
+        with TestClient(app) as second:
+            assert app.state.task_service is not service
+            assert [t["title"] for t in _json(second.get("/tasks"))] == ["Test Task"]
+            assert second.post("/tasks", content=TASK_1, headers=JSON_HEADERS).status_code == 201
 
-    @pytest.mark.asyncio 
-    async def test_create_task_exception_handling(self):
+    def test_cors_headers(self, client):
+        """Test CORS headers on simple and preflight requests"""
+        simple = client.get("/health", headers={"Origin": "http://example.com"})
+        preflight = client.options("/tasks", headers={
+            "Origin": "http://example.com",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "X-Custom"
+        })
+        
+        assert simple.headers["access-control-allow-origin"] == "*"
+        assert preflight.status_code == 200
+        assert preflight.headers["access-control-allow-origin"] == "http://example.com"
+        assert preflight.headers["access-control-allow-headers"] == "X-Custom"
+        assert "POST" in preflight.headers["access-control-allow-methods"]
+
+    def test_create_task_exception_handling(self, client, override_service):
         """Test exception handling in create task"""
-        from httpx import ASGITransport
-        with patch('app.task_service.create_task') as mock_create:
-            mock_create.side_effect = Exception("Database error")
-            
-            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-                response = await client.post("/tasks", json={
-                    "title": "Test Task"
-                })
-            
-            assert response.status_code == 500
-            assert "Failed to create task" in response.json()["detail"]
+        override_service(FailingService(Exception("Database error")))
+        
+        response = client.post("/tasks", content=TASK, headers=JSON_HEADERS)
+        
+        assert response.status_code == 500
+        assert b"Failed to create task" in response.content
 
-    @pytest.mark.asyncio
-    async def test_list_tasks_exception_handling(self):
+    def test_list_tasks_exception_handling(self, client, override_service):
         """Test exception handling in list tasks"""
-        from httpx import ASGITransport
-        with patch('app.task_service.list_tasks') as mock_list:
-            mock_list.side_effect = Exception("Database error")
-            
-            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-                response = await client.get("/tasks")
-            
-            assert response.status_code == 500
-            assert "Failed to retrieve tasks" in response.json()["detail"]
\ No newline at end of file
+        override_service(FailingService(Exception("Database error")))
+        
+        response = client.get("/tasks")
+        
+        assert response.status_code == 500
+        assert b"Failed to retrieve tasks" in response.content
+
+    def test_database_disconnect_handling(self, client, override_service):
+        """Test that a lost DB connection asks the client to retry"""
+        override_service(FailingService(DisconnectionError("connection lost")))
+        
+        response = client.get("/tasks/1")
+        
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "0"
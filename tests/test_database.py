@@ -2,17 +2,24 @@
 Tests for database module
 """
 import pytest
-from unittest.mock import patch, MagicMock
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+from unittest.mock import patch
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
 import database
-from database_models import Base, TodoDB, TodoStatusEnum, TodoPriorityEnum
+
+class FakeSession:
+    """Minimal stand-in for a Session that records whether it was closed"""
+    closed = False
+
+    def close(self):
+        self.closed = True
 
 class TestDatabaseModule:
     def test_engine_creation(self):
         """Test that engine is created correctly"""
         assert database.engine is not None
-        assert database.engine.url.drivername == "mysql+pymysql"
+        expected_url = database.settings.database_url or database.settings.mysql_url
+        assert database.engine.url.drivername == make_url(expected_url).drivername
 
     def test_session_local_creation(self):
         """Test that SessionLocal is created correctly"""
@@ -24,48 +31,58 @@ class TestDatabaseModule:
         database.create_tables()
         mock_create_all.assert_called_once_with(bind=database.engine)
 
-    @patch('database.SessionLocal')
-    def test_get_db_generator(self, mock_session_local):
+    def test_get_db_generator(self, monkeypatch):
         """Test get_db generator function"""
-        # Mock session
-        mock_session = MagicMock()
-        mock_session_local.return_value = mock_session
+        fake = FakeSession()
+        monkeypatch.setattr(database, "SessionLocal", lambda: fake)
         
         # Get the generator
         db_gen = database.get_db()
         
         # Test that it yields the session
         db_session = next(db_gen)
-        assert db_session == mock_session
+        assert db_session is fake
         
         # Test that it closes on completion
-        try:
+        with pytest.raises(StopIteration):
             next(db_gen)
-        except StopIteration:
-            mock_session.close.assert_called_once()
+        assert fake.closed is True
 
-    @patch('database.SessionLocal')
-    def test_get_db_exception_handling(self, mock_session_local):
+    def test_get_db_exception_handling(self, monkeypatch):
         """Test get_db exception handling"""
-        mock_session = MagicMock()
-        mock_session_local.return_value = mock_session
+        fake = FakeSession()
+        monkeypatch.setattr(database, "SessionLocal", lambda: fake)
         
         # Simulate an exception during session use
         db_gen = database.get_db()
-        db_session = next(db_gen)
+        next(db_gen)
         
         # Force close by sending an exception
-        try:
-            db_gen.throw(Exception("Test exception"))
-        except Exception:
-            pass
+        with pytest.raises(RuntimeError):
+            db_gen.throw(RuntimeError("Test exception"))
         
         # Verify session was closed
-        mock_session.close.assert_called_once()
+        assert fake.closed is True
+
+    def test_async_engine_creation(self):
+        """Test that the async engine uses aiomysql and the configured pool size"""
+        assert database.async_engine.url.drivername == "mysql+aiomysql"
+        assert database.async_engine.pool.size() == database.settings.db_pool_size
+
+    @pytest.mark.asyncio
+    async def test_get_async_db_generator(self):
+        """Test get_async_db yields an AsyncSession"""
+        db_gen = database.get_async_db()
+        db_session = await db_gen.__anext__()
+        assert isinstance(db_session, AsyncSession)
+        await db_gen.aclose()
 
     def test_engine_configuration(self):
         """Test engine configuration parameters"""
         # Test that engine has the expected configuration
         assert hasattr(database.engine, 'pool')
+        # Stale connections are handled by keepalives/recycling, not a ping per checkout
+        assert database.engine.pool._pre_ping is False
+        assert database.engine.pool._recycle == 300
         # Note: We can't test exact pool settings without database connection
         # but we can verify the engine exists and is properly configured
\ No newline at end of file
@@ -2,23 +2,25 @@
 Tests for database models
 """
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import SmallInteger
 from database_models import Base, TodoDB, TodoStatusEnum, TodoPriorityEnum
-from datetime import datetime
 
 class TestDatabaseModels:
     def test_todo_status_enum(self):
-        """Test TodoStatusEnum values"""
-        assert TodoStatusEnum.PENDING.value == "pending"
-        assert TodoStatusEnum.IN_PROGRESS.value == "in_progress"
-        assert TodoStatusEnum.COMPLETED.value == "completed"
+        """Test TodoStatusEnum codes and labels"""
+        assert TodoStatusEnum.PENDING.value == 0
+        assert TodoStatusEnum.IN_PROGRESS.value == 1
+        assert TodoStatusEnum.COMPLETED.value == 2
+        assert [s.label for s in TodoStatusEnum] == ["pending", "in_progress", "completed"]
+        assert TodoStatusEnum.from_label("in_progress") is TodoStatusEnum.IN_PROGRESS
 
     def test_todo_priority_enum(self):
-        """Test TodoPriorityEnum values"""
-        assert TodoPriorityEnum.LOW.value == "low"
-        assert TodoPriorityEnum.MEDIUM.value == "medium"
-        assert TodoPriorityEnum.HIGH.value == "high"
+        """Test TodoPriorityEnum codes and labels"""
+        assert TodoPriorityEnum.LOW.value == 0
+        assert TodoPriorityEnum.MEDIUM.value == 1
+        assert TodoPriorityEnum.HIGH.value == 2
+        assert [p.label for p in TodoPriorityEnum] == ["low", "medium", "high"]
+        assert TodoPriorityEnum.from_label("high") is TodoPriorityEnum.HIGH
 
     def test_todo_db_model_creation(self):
         """Test TodoDB model creation and attributes"""
@@ -65,30 +67,59 @@ class TestDatabaseModels:
         assert Base is not None
         assert hasattr(Base, 'metadata')
 
+    # Expected attributes per column; "type" is checked with isinstance, "length" on the column type
+    EXPECTED_COLUMNS = [
+        ("id", {"primary_key": True, "autoincrement": True, "index": True}),
+        ("title", {"nullable": False, "index": True, "length": 200}),
+        ("description", {"nullable": True}),
+        ("status", {"nullable": False, "index": True, "type": SmallInteger}),
+        ("priority", {"nullable": False, "index": True}),
+    ]
+
     def test_column_properties(self):
         """Test column properties and constraints"""
-        # Test id column
-        id_col = TodoDB.__table__.columns['id']
-        assert id_col.primary_key
-        assert id_col.autoincrement
-        assert id_col.index
-
-        # Test title column
-        title_col = TodoDB.__table__.columns['title']
-        assert not title_col.nullable
-        assert title_col.type.length == 200
-        assert title_col.index
+        columns = TodoDB.__table__.columns
+        for name, spec in self.EXPECTED_COLUMNS:
+            col = columns[name]
+            for attr, expected in spec.items():
+                if attr == "type":
+                    assert isinstance(col.type, expected), name
+                elif attr == "length":
+                    assert col.type.length == expected, name
+                else:
+                    assert bool(getattr(col, attr)) is expected, (name, attr)
 
-        # Test description column
-        desc_col = TodoDB.__table__.columns['description']
-        assert desc_col.nullable
+    def test_todo_db_roundtrip(self, db_session):
+        """Test storing and loading a TodoDB row"""
+        todo = TodoDB(title="Stored Todo", priority=TodoPriorityEnum.HIGH)
+        db_session.add(todo)
+        db_session.flush()
+        
+        loaded = db_session.get(TodoDB, todo.id)
+        
+        assert loaded.title == "Stored Todo"
+        assert loaded.status == TodoStatusEnum.PENDING
+        assert TodoPriorityEnum(loaded.priority).label == "high"
+        assert loaded.created_at is not None
 
-        # Test status column
-        status_col = TodoDB.__table__.columns['status']
-        assert not status_col.nullable
-        assert status_col.index
+    @pytest.mark.parametrize("title", ["First", "Second"])
+    def test_committed_rows_do_not_leak_between_tests(self, db_session, title):
+        """Test that commits are rolled back after each test"""
+        db_session.add(TodoDB(title=title))
+        db_session.commit()
+        
+        assert db_session.query(TodoDB).count() == 1
 
-        # Test priority column
-        priority_col = TodoDB.__table__.columns['priority']
-        assert not priority_col.nullable
-        assert priority_col.index
\ No newline at end of file
+    def test_seed_todos_bulk_insert(self, db_session, seed_todos):
+        """Test counting todos by status after a bulk insert"""
+        seed_todos([
+            {"title": "High Priority", "priority": TodoPriorityEnum.HIGH},
+            {"title": "Low Priority", "priority": TodoPriorityEnum.LOW, "status": TodoStatusEnum.COMPLETED},
+        ])
+        
+        high = db_session.query(TodoDB).filter(TodoDB.priority == TodoPriorityEnum.HIGH).one()
+        completed = db_session.query(TodoDB).filter(TodoDB.status == TodoStatusEnum.COMPLETED).count()
+        
+        assert high.title == "High Priority"
+        assert high.status == TodoStatusEnum.PENDING
+        assert completed == 1
@@ -1,9 +1,10 @@
 """
 Tests for the TaskService business logic
 """
+import threading
 import pytest
 from todo_service import TaskService
-from models import TaskCreate, TaskUpdate
+from models import TaskCreate, TaskMS, TaskUpdate, STATUS_DONE, STATUS_IN_PROGRESS
 
 class TestTaskService:
     
@@ -22,6 +23,25 @@ class TestTaskService:
         assert task.description == "Test Description"
         assert task.status == "pending"
     
+    def test_tasks_are_stored_as_slotted_records(self, clean_service):
+        """Test that stored tasks are TaskMS records without a per-instance __dict__"""
+        task = clean_service.create_task(TaskCreate(title="Test Task"))
+        
+        assert isinstance(task, TaskMS)
+        assert not hasattr(task, "__dict__")
+    
+    def test_stored_statuses_are_interned(self, clean_service):
+        """Test that stored statuses are the shared TASK_STATUSES objects"""
+        service = clean_service
+        task1 = service.create_task(TaskCreate(title="Task 1"))
+        task2 = service.create_task(TaskCreate(title="Task 2"))
+        
+        service.update_task(task1.id, TaskUpdate(status="".join(["in_", "progress"])))
+        service.mark_done([task2.id])
+        
+        assert task1.status is STATUS_IN_PROGRESS
+        assert task2.status is STATUS_DONE
+    
     def test_get_task_exists(self, clean_service):
         """Test getting an existing task"""
         service = clean_service
@@ -64,6 +84,56 @@ class TestTaskService:
         assert task1 in tasks
         assert task2 in tasks
     
+    def _seed_filter_data(self, service):
+        """Create tasks covering every status, with text in titles and descriptions"""
+        service.create_task(TaskCreate(title="Buy Milk"))
+        service.create_task(TaskCreate(title="Groceries", description="milk and eggs"))
+        service.create_task(TaskCreate(title="Write docs"))
+        service.create_task(TaskCreate(title="Write tests"))
+        service.update_task(1, TaskUpdate(status="done"))
+        service.update_task(3, TaskUpdate(status="in_progress"))
+    
+    def test_list_tasks_filter_by_status(self, clean_service):
+        """Test filtering tasks by status"""
+        service = clean_service
+        self._seed_filter_data(service)
+        
+        for status, expected_ids in [
+            ("pending", [2, 4]),
+            ("in_progress", [3]),
+            ("done", [1]),
+        ]:
+            assert [t.id for t in service.list_tasks(status=status)] == expected_ids, status
+        
+        service.clear_done()
+        assert service.list_tasks(status="done") == []
+    
+    def test_list_tasks_search(self, clean_service):
+        """Test searching tasks in title and description, alone and with a status"""
+        service = clean_service
+        self._seed_filter_data(service)
+        
+        for filters, expected_ids in [
+            ({"search": "MILK"}, [1, 2]),
+            ({"search": "eggs"}, [2]),
+            ({"search": "nothing"}, []),
+            ({"search": "riesmilk"}, []),  # spans the title/description join
+            ({"status": "in_progress", "search": "write"}, [3]),
+            ({"status": "done", "search": "write"}, []),
+        ]:
+            assert [t.id for t in service.list_tasks(**filters)] == expected_ids, filters
+    
+    def test_list_tasks_search_after_update(self, clean_service):
+        """Test that search sees titles and descriptions changed by updates"""
+        service = clean_service
+        task = service.create_task(TaskCreate(title="Old Title"))
+        
+        service.update_task(task.id, TaskUpdate(title="New Title", description="Some NOTES"))
+        
+        assert service.list_tasks(search="old") == []
+        assert service.list_tasks(search="new") == [task]
+        assert service.list_tasks(search="notes") == [task]
+    
     def test_update_task_exists(self, clean_service):
         """Test updating an existing task"""
         service = clean_service
@@ -82,6 +152,50 @@ class TestTaskService:
         assert updated_task.description == "New description"
         assert updated_task.status == "in_progress"
     
+    def test_status_index_follows_updates_and_deletes(self, clean_service):
+        """Test that status filtering reflects updates and deletions"""
+        service = clean_service
+        task1 = service.create_task(TaskCreate(title="Task 1"))
+        task2 = service.create_task(TaskCreate(title="Task 2"))
+        
+        service.update_task(task1.id, TaskUpdate(status="in_progress"))
+        service.update_task(task2.id, TaskUpdate(status="in_progress"))
+        service.delete_task(task2.id)
+        
+        assert service.list_tasks(status="pending") == []
+        assert [t.id for t in service.list_tasks(status="in_progress")] == [task1.id]
+    
+    def test_status_filter_keeps_creation_order(self, clean_service):
+        """Test that tasks moved into a status are listed by id, not by move order"""
+        service = clean_service
+        tasks = [service.create_task(TaskCreate(title=f"Task {i}")) for i in range(1, 4)]
+        
+        for task in reversed(tasks):
+            service.update_task(task.id, TaskUpdate(status="done"))
+        
+        assert [t.id for t in service.list_tasks(status="done")] == [1, 2, 3]
+    
+    def test_update_task_null_status_keeps_status(self, clean_service):
+        """Test that an explicit null status leaves the status unchanged"""
+        service = clean_service
+        task = service.create_task(TaskCreate(title="Task"))
+        
+        updated_task = service.update_task(task.id, TaskUpdate(title="Renamed", status=None))
+        
+        assert updated_task.title == "Renamed"
+        assert updated_task.status == "pending"
+        assert service.list_tasks(status="pending") == [updated_task]
+    
+    def test_update_task_null_title_keeps_title(self, clean_service):
+        """Test that an explicit null title leaves the title unchanged"""
+        service = clean_service
+        task = service.create_task(TaskCreate(title="Task"))
+        
+        updated_task = service.update_task(task.id, TaskUpdate(title=None, description="Notes"))
+        
+        assert updated_task.title == "Task"
+        assert updated_task.description == "Notes"
+    
     def test_update_task_not_exists(self, clean_service):
         """Test updating a non-existent task"""
         service = clean_service
@@ -101,10 +215,100 @@ class TestTaskService:
         assert success is True
         assert service.get_task(task.id) is None
     
+    def test_clear_done(self, clean_service):
+        """Test deleting all done tasks at once"""
+        service = clean_service
+        task1 = service.create_task(TaskCreate(title="Task 1"))
+        task2 = service.create_task(TaskCreate(title="Task 2"))
+        task3 = service.create_task(TaskCreate(title="Task 3"))
+        service.update_task(task1.id, TaskUpdate(status="done"))
+        service.update_task(task3.id, TaskUpdate(status="done"))
+        
+        deleted = service.clear_done()
+        
+        assert deleted == 2
+        assert service.list_tasks() == [task2]
+        assert service.list_tasks(status="done") == []
+        assert service.get_stats()["total"] == 1
+        assert service.clear_done() == 0
+    
+    def test_mark_done(self, clean_service):
+        """Test marking several tasks as done at once"""
+        service = clean_service
+        for i in range(1, 5):
+            service.create_task(TaskCreate(title=f"Task {i}"))
+        service.update_task(2, TaskUpdate(status="done"))
+        
+        changed = service.mark_done([3, 1, 2, 999, 3])
+        
+        assert [t.id for t in changed] == [3, 1]
+        assert [t.id for t in service.list_tasks(status="done")] == [1, 2, 3]
+        assert [t.id for t in service.list_tasks(status="pending")] == [4]
+        assert service.get_stats()["by_status"]["done"] == 3
+    
     def test_delete_task_not_exists(self, clean_service):
         """Test deleting a non-existent task"""
         service = clean_service
         
         success = service.delete_task(999)
         
-        assert success is False
\ No newline at end of file
+        assert success is False
+    
+    def test_concurrent_creates_and_deletes_keep_indexes_consistent(self, clean_service):
+        """Test that writes from several threads leave the indexes in sync"""
+        service = clean_service
+        
+        def worker():
+            for _ in range(200):
+                task = service.create_task(TaskCreate(title="Task"))
+                service.list_tasks(status="pending", search="task")
+                service.delete_task(task.id)
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert service.list_tasks() == []
+        assert service.get_stats()["by_status"]["pending"] == 0
+        assert service.create_task(TaskCreate(title="Last")).id == 801
+    
+    def test_get_stats(self, clean_service):
+        """Test task statistics"""
+        service = clean_service
+        task1 = service.create_task(TaskCreate(title="Task 1"))
+        service.create_task(TaskCreate(title="Task 2"))
+        service.update_task(task1.id, TaskUpdate(status="done"))
+        
+        stats = service.get_stats()
+        
+        assert stats == {
+            "total": 2,
+            "by_status": {"pending": 1, "in_progress": 0, "done": 1}
+        }
+    
+    def test_get_stats_cache_invalidated_on_change(self, clean_service):
+        """Test that cached stats are refreshed after a mutation"""
+        service = clean_service
+        task = service.create_task(TaskCreate(title="Task 1"))
+        first = service.get_stats()
+        
+        assert service.get_stats() == first
+        
+        service.delete_task(task.id)
+        stats = service.get_stats()
+        
+        assert stats["total"] == 0
+        assert stats["by_status"]["pending"] == 0
+    
+    def test_get_stats_result_does_not_alias_cache(self, clean_service):
+        """Test that mutating returned stats leaves later calls unaffected"""
+        service = clean_service
+        service.create_task(TaskCreate(title="Task 1"))
+        
+        stats = service.get_stats()
+        stats["total"] = 99
+        stats["by_status"]["pending"] = 99
+        
+        assert service.get_stats() == {"total": 1, "by_status": {"pending": 1, "in_progress": 0, "done": 0}}
@@ -0,0 +1,182 @@
+"""
+Tests for the append-only task log
+"""
+import threading
+
+import pytest
+from task_store import TaskLog, RECORD
+from todo_service import TaskService
+from models import TaskCreate, TaskUpdate
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "tasks.log")
+
+class TestTaskLog:
+    def test_replay_empty_log(self, log_path):
+        """Test replaying a log with no records"""
+        log = TaskLog(log_path)
+        assert list(log.replay()) == []
+        log.close()
+
+    def test_append_and_replay(self, log_path):
+        """Test that written records are replayed in order"""
+        log = TaskLog(log_path)
+        log.write(TaskLog.pack(1, "pending", "Título", None))
+        log.write(TaskLog.pack(1, "done", "Título", ""))
+        log.write(TaskLog.pack_delete(1))
+        
+        assert list(log.replay()) == [
+            (1, False, "pending", "Título", None),
+            (1, False, "done", "Título", ""),
+            (1, True, "pending", "", None),
+        ]
+        log.close()
+
+    def test_replay_ignores_torn_write(self, log_path):
+        """Test that a partial trailing record is ignored"""
+        log = TaskLog(log_path)
+        log.write(TaskLog.pack(1, "pending", "Task", None))
+        log.close()
+        with open(log_path, "ab") as f:
+            f.write(b"\x00" * (RECORD.size // 2))
+        
+        assert [r[0] for r in TaskLog(log_path).replay()] == [1]
+
+class TestTaskServicePersistence:
+    def test_state_survives_restart(self, log_path):
+        """Test that a new service rebuilds tasks from the log"""
+        service = TaskService(TaskLog(log_path))
+        task1 = service.create_task(TaskCreate(title="Task 1", description="First"))
+        task2 = service.create_task(TaskCreate(title="Task 2"))
+        service.update_task(task1.id, TaskUpdate(status="done"))
+        service.delete_task(task2.id)
+        
+        restored = TaskService(TaskLog(log_path))
+        
+        assert [(t.id, t.title, t.description, t.status) for t in restored.list_tasks()] == [
+            (task1.id, "Task 1", "First", "done")
+        ]
+        assert restored.list_tasks(status="done")[0].id == task1.id
+        assert restored.create_task(TaskCreate(title="Task 3")).id == 3
+
+    def test_restart_keeps_creation_order(self, log_path):
+        """Test that replaying updates does not reorder tasks"""
+        service = TaskService(TaskLog(log_path))
+        service.create_task(TaskCreate(title="Task 1"))
+        service.create_task(TaskCreate(title="Task 2"))
+        service.update_task(1, TaskUpdate(title="Task 1 renamed"))
+        
+        restored = TaskService(TaskLog(log_path))
+        
+        assert [t.id for t in restored.list_tasks()] == [1, 2]
+        assert [t.id for t in restored.list_tasks(search="task")] == [1, 2]
+        assert restored.list_tasks(search="renamed")[0].id == 1
+
+    def test_null_title_update_is_persisted_unchanged(self, log_path):
+        """Test that a null title neither breaks persistence nor clears the title"""
+        service = TaskService(TaskLog(log_path))
+        service.create_task(TaskCreate(title="Task 1"))
+        service.update_task(1, TaskUpdate.model_construct(title=None, status="done"))
+        
+        restored = TaskService(TaskLog(log_path))
+        
+        assert [(t.title, t.status) for t in restored.list_tasks()] == [("Task 1", "done")]
+
+    def test_clear_done_persists_deletes(self, log_path):
+        """Test that bulk deletion of done tasks survives a restart"""
+        service = TaskService(TaskLog(log_path))
+        task1 = service.create_task(TaskCreate(title="Task 1"))
+        service.create_task(TaskCreate(title="Task 2"))
+        service.update_task(task1.id, TaskUpdate(status="done"))
+        service.clear_done()
+        
+        restored = TaskService(TaskLog(log_path))
+        
+        assert [t.title for t in restored.list_tasks()] == ["Task 2"]
+
+    def test_mark_done_persists(self, log_path):
+        """Test that bulk status changes survive a restart"""
+        service = TaskService(TaskLog(log_path))
+        service.create_task(TaskCreate(title="Task 1"))
+        service.create_task(TaskCreate(title="Task 2"))
+        service.mark_done([1, 2])
+        
+        restored = TaskService(TaskLog(log_path))
+        
+        assert [t.id for t in restored.list_tasks(status="done")] == [1, 2]
+
+    def test_clear_truncates_log(self, log_path):
+        """Test that clearing the service empties the log"""
+        service = TaskService(TaskLog(log_path))
+        service.create_task(TaskCreate(title="Task 1"))
+        
+        service.clear()
+        
+        assert TaskService(TaskLog(log_path)).list_tasks() == []
+
+    def test_log_writes_happen_outside_the_lock_in_order(self, log_path, monkeypatch):
+        """Test that a stalled log write neither blocks reads nor reorders later writes"""
+        service = TaskService(TaskLog(log_path))
+        task = service.create_task(TaskCreate(title="Task 1"))
+        writing, release = threading.Event(), threading.Event()
+        write = service._log.write
+        
+        def stalled_write(records):
+            writing.set()
+            release.wait(5)
+            write(records)
+        monkeypatch.setattr(service._log, "write", stalled_write)
+        
+        updater = threading.Thread(target=service.update_task, args=(task.id, TaskUpdate(status="done")))
+        updater.start()
+        assert writing.wait(5)
+        # Reads go through while the update's write is still stalled
+        assert [t.id for t in service.list_tasks(status="done")] == [task.id]
+        assert service.get_stats()["by_status"]["done"] == 1
+        assert updater.is_alive()
+        
+        deleter = threading.Thread(target=service.delete_task, args=(task.id,))
+        deleter.start()
+        release.set()
+        updater.join()
+        deleter.join()
+        
+        # The delete was applied last, so it must also be written last
+        assert TaskService(TaskLog(log_path)).list_tasks() == []
+
+    def test_mark_done_pack_failure_changes_nothing(self, log_path, monkeypatch):
+        """Test that a record that fails to pack leaves memory unchanged and later writes unblocked"""
+        service = TaskService(TaskLog(log_path))
+        task = service.create_task(TaskCreate(title="Task 1"))
+        
+        def failing_pack(*args):
+            raise ValueError("bad record")
+        monkeypatch.setattr(service._log, "pack", failing_pack)
+        with pytest.raises(ValueError):
+            service.mark_done([task.id])
+        monkeypatch.undo()
+        
+        assert task.status == "pending"
+        assert service.get_stats()["by_status"]["done"] == 0
+        creator = threading.Thread(target=service.create_task, args=(TaskCreate(title="Task 2"),))
+        creator.start()
+        creator.join(5)
+        assert not creator.is_alive()
+        assert [t.title for t in TaskService(TaskLog(log_path)).list_tasks(status="pending")] == ["Task 1", "Task 2"]
+
+    def test_close_waits_for_reserved_writes(self, log_path):
+        """Test that closing the service lets changes already applied reach the log first"""
+        service = TaskService(TaskLog(log_path))
+        with service._lock:
+            ticket = service._reserve()
+        
+        closer = threading.Thread(target=service.close)
+        closer.start()
+        closer.join(0.1)
+        assert closer.is_alive()
+        
+        service._write(ticket, TaskLog.pack(1, "pending", "Task 1", None))
+        closer.join(5)
+        assert service._log._file.closed
+        assert [t.title for t in TaskService(TaskLog(log_path)).list_tasks()] == ["Task 1"]
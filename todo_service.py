@@ -1,55 +1,290 @@
-from typing import List, Optional, Dict
-from models import Task, TaskCreate, TaskUpdate, TaskStatus
+import sys
+import threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Dict, Tuple
+from models import (
+    TaskCreate, TaskMS, TaskUpdate, TaskStatus, TASK_STATUSES, STATUS_DONE, STATUS_PENDING
+)
+from task_store import TaskLog
+
+# Trust boundary: request bodies are validated by the msgspec/Pydantic models at
+# the API edge, so records are built directly. Stored statuses are always the
+# interned TASK_STATUSES objects, so they can be compared with `is`.
 
 class TaskService:
-    """Business logic for Task operations with in-memory storage"""
+    """Business logic for Task operations with in-memory storage, optionally persisted to a TaskLog"""
     
-    def __init__(self):
-        self._tasks: Dict[int, Task] = {}
+    def __init__(self, log: Optional[TaskLog] = None):
+        self._tasks: Dict[int, TaskMS] = {}
         self._next_id: int = 1
+        # Secondary index: status -> ids of tasks with that status, kept sorted so
+        # filtered listings come out in creation order without a per-call sort
+        self._by_status: Dict[str, List[int]] = {s: [] for s in TASK_STATUSES}
+        # Lowercased UTF-8 "title\0description" blob per task, refreshed on write for search
+        self._search_text: Dict[int, bytes] = {}
+        # Mutation counter used to invalidate the cached stats
+        self._version: int = 0
+        self._stats_version: int = -1
+        # (total, counts in TASK_STATUSES order); immutable so callers can't corrupt it
+        self._stats_cache: Tuple[int, Tuple[int, ...]] = (0, ())
+        self._log = log
+        # Guards the state above; requests may run on the event loop and on
+        # threadpool workers at the same time. It is never held across log I/O,
+        # so reads don't wait on another request's fsync
+        self._lock = threading.RLock()
+        # Log writes happen after the state lock is released, in the order the
+        # changes were applied: each change takes a ticket under the state lock
+        # and writes once every earlier ticket has been written
+        self._log_cond = threading.Condition()
+        self._log_tickets: int = 0
+        self._log_written: int = 0
+        if log is not None:
+            self._load(log)
     
-    def create_task(self, task_data: TaskCreate) -> Task:
-        """Create a new task"""
-        task = Task(
-            id=self._next_id,
-            title=task_data.title,
-            description=task_data.description,
-            status="pending"
-        )
+    def _load(self, log: TaskLog) -> None:
+        """Rebuild the in-memory state from the task log"""
+        for task_id, deleted, status, title, description in log.replay():
+            task = self._tasks.get(task_id)
+            if deleted:
+                if task is not None:
+                    del self._tasks[task_id]
+                    del self._search_text[task_id]
+                    self._unindex(task.status, task_id)
+            elif task is None:
+                self._tasks[task_id] = task = TaskMS(id=task_id, title=title, description=description, status=status)
+                insort(self._by_status[status], task_id)
+                self._index_text(task)
+            else:
+                # Update in place so the dicts keep creation (id) order
+                if status is not task.status:
+                    self._unindex(task.status, task_id)
+                    insort(self._by_status[status], task_id)
+                task.title, task.description, task.status = title, description, status
+                self._index_text(task)
+            self._next_id = max(self._next_id, task_id + 1)
+    
+    def close(self) -> None:
+        """Release the task log, if any, once every change applied so far has been written"""
+        if self._log is not None:
+            with self._log_cond:
+                self._log_cond.wait_for(lambda: self._log_written == self._log_tickets)
+                self._log.close()
+    
+    def _unindex(self, status: str, task_id: int) -> None:
+        """Remove a task id from its status bucket"""
+        ids = self._by_status[status]
+        del ids[bisect_left(ids, task_id)]
+    
+    def _index_text(self, task: TaskMS) -> None:
+        """Store the lowercased searchable text of a task"""
+        # NUL separator keeps a needle from matching across title and description
+        self._search_text[task.id] = f"{task.title}\0{task.description or ''}".lower().encode()
+    
+    def _pack(self, task_id: int, status: str, title: str, description: Optional[str]) -> Optional[bytes]:
+        """Encode a task's log record, if the service is persisted"""
+        if self._log is None:
+            return None
+        return self._log.pack(task_id, status, title, description)
+    
+    def _reserve(self) -> Optional[int]:
+        """Take the next log ticket (call with the state lock held), if the service is persisted"""
+        if self._log is None:
+            return None
+        ticket = self._log_tickets
+        self._log_tickets += 1
+        return ticket
+    
+    @contextmanager
+    def _log_turn(self, ticket: int) -> Iterator[TaskLog]:
+        """Hold the task log once every change before this ticket has been written"""
+        with self._log_cond:
+            self._log_cond.wait_for(lambda: self._log_written == ticket)
+            try:
+                yield self._log
+            finally:
+                # Pass the turn on even if the write failed, so later changes don't hang
+                self._log_written += 1
+                self._log_cond.notify_all()
+    
+    def _write(self, ticket: Optional[int], records: bytes) -> None:
+        """Append packed records to the log in ticket order, outside the state lock"""
+        if ticket is not None:
+            with self._log_turn(ticket) as log:
+                log.write(records)
+    
+    def clear(self) -> None:
+        """Remove all tasks and reset the id sequence"""
+        with self._lock:
+            self._tasks.clear()
+            self._search_text.clear()
+            for ids in self._by_status.values():
+                ids.clear()
+            self._next_id = 1
+            self._version += 1
+            ticket = self._reserve()
         
-        self._tasks[self._next_id] = task
-        self._next_id += 1
+        if ticket is not None:
+            with self._log_turn(ticket) as log:
+                log.truncate()
+    
+    def create_task(self, task_data: TaskCreate) -> TaskMS:
+        """Create a new task"""
+        with self._lock:
+            task_id = self._next_id
+            task = TaskMS(
+                id=task_id,
+                title=task_data.title,
+                description=task_data.description,
+                status=STATUS_PENDING
+            )
+            # Pack before touching any state, so a bad value can't desync memory and disk
+            record = self._pack(task_id, task.status, task.title, task.description)
+            
+            self._tasks[task_id] = task
+            # New ids are always the largest, so appending keeps the bucket sorted
+            self._by_status[STATUS_PENDING].append(task_id)
+            self._index_text(task)
+            self._next_id = task_id + 1
+            self._version += 1
+            ticket = self._reserve()
         
+        self._write(ticket, record)
         return task
     
-    def get_task(self, task_id: int) -> Optional[Task]:
+    def get_task(self, task_id: int) -> Optional[TaskMS]:
         """Get a task by ID"""
+        # A single dict lookup is atomic, so like the fetches in list_tasks it needs no lock
         return self._tasks.get(task_id)
     
-    def list_tasks(self) -> List[Task]:
-        """List all tasks"""
-        return list(self._tasks.values())
+    def list_tasks(self, status: Optional[TaskStatus] = None, search: Optional[str] = None) -> List[TaskMS]:
+        """List tasks, optionally filtered by status and/or a title/description search"""
+        with self._lock:
+            if not (status or search):
+                return list(self._tasks.values())
+            # Snapshot the candidate ids and release the lock before visiting them.
+            # Status filtering only looks at the matching ids (kept in creation order);
+            # without a status, the search text dict holds every id in creation order
+            ids = list(self._by_status[status] if status else self._search_text)
+        
+        if search:
+            # One bytes scan per task against the blob built on write; ids deleted
+            # since the snapshot have no blob and are skipped
+            needle = search.lower().encode()
+            text_get = self._search_text.get
+            ids = [i for i in ids if needle in text_get(i, b"")]
+        # Tasks deleted since the snapshot come back as None and are skipped
+        return [task for task in map(self._tasks.get, ids) if task is not None]
     
-    def update_task(self, task_id: int, updates: TaskUpdate) -> Optional[Task]:
+    def update_task(self, task_id: int, updates: TaskUpdate) -> Optional[TaskMS]:
         """Update an existing task"""
-        task = self._tasks.get(task_id)
-        if not task:
-            return None
-        
-        # Update fields if provided
-        update_data = updates.model_dump(exclude_unset=True)
-        
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                return None
+            
+            # Only the fields the caller provided, read directly instead of via model_dump;
+            # an explicit null title or status means "leave unchanged"
+            fields_set = updates.__pydantic_fields_set__
+            title, description, status = task.title, task.description, task.status
+            if "title" in fields_set and updates.title is not None:
+                title = updates.title
+            if "description" in fields_set:
+                description = updates.description
+            if "status" in fields_set and updates.status is not None:
+                # Store the interned value so index lookups compare by identity
+                status = sys.intern(updates.status)
+            
+            # Pack before mutating, so a bad value can't leave memory and disk out of sync
+            record = self._pack(task_id, status, title, description)
+            
+            if status is not task.status:
+                self._unindex(task.status, task_id)
+                insort(self._by_status[status], task_id)
+            text_changed = title != task.title or description != task.description
+            task.title, task.description, task.status = title, description, status
+            if text_changed:
+                self._index_text(task)
+            
+            self._version += 1
+            ticket = self._reserve()
         
+        self._write(ticket, record)
         return task
     
+    def mark_done(self, task_ids: List[int]) -> List[TaskMS]:
+        """Mark several tasks as done in one pass, returning the tasks that changed"""
+        with self._lock:
+            changed = []
+            # dict.fromkeys drops repeated ids while keeping their order
+            for task_id in dict.fromkeys(task_ids):
+                task = self._tasks.get(task_id)
+                if task is not None and task.status is not STATUS_DONE:
+                    changed.append(task)
+            if not changed:
+                return changed
+            
+            # Pack the new state before mutating, so a bad value can't leave memory and disk out of sync
+            records = b""
+            if self._log is not None:
+                records = b"".join(self._log.pack(t.id, STATUS_DONE, t.title, t.description) for t in changed)
+            
+            for task in changed:
+                self._unindex(task.status, task.id)
+                task.status = STATUS_DONE
+            # Re-sort the done bucket once instead of bisecting in every id
+            done = self._by_status[STATUS_DONE]
+            done.extend(task.id for task in changed)
+            done.sort()
+            self._version += 1
+            ticket = self._reserve()
+        
+        self._write(ticket, records)
+        return changed
+    
     def delete_task(self, task_id: int) -> bool:
         """Delete a task by ID"""
-        if task_id in self._tasks:
-            del self._tasks[task_id]
-            return True
-        return False
-
-# Global service instance
-task_service = TaskService()
\ No newline at end of file
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return False
+            
+            self._unindex(task.status, task_id)
+            del self._search_text[task_id]
+            self._version += 1
+            ticket = self._reserve()
+        
+        if ticket is not None:
+            self._write(ticket, TaskLog.pack_delete(task_id))
+        return True
+    
+    def clear_done(self) -> int:
+        """Delete all done tasks, returning how many were removed"""
+        with self._lock:
+            done_ids = self._by_status[STATUS_DONE]
+            self._by_status[STATUS_DONE] = []
+            for task_id in done_ids:
+                del self._tasks[task_id]
+                del self._search_text[task_id]
+            
+            if not done_ids:
+                return 0
+            self._version += 1
+            ticket = self._reserve()
+        
+        if ticket is not None:
+            self._write(ticket, TaskLog.pack_delete(*done_ids))
+        return len(done_ids)
+    
+    def get_stats(self) -> Dict:
+        """Get task counts, recomputed only after the tasks have changed"""
+        with self._lock:
+            if self._stats_version != self._version:
+                self._stats_cache = (
+                    len(self._tasks),
+                    tuple(len(self._by_status[s]) for s in TASK_STATUSES)
+                )
+                self._stats_version = self._version
+            total, counts = self._stats_cache
+        # A fresh dict per call, so mutating the result never touches the cache
+        return {"total": total, "by_status": dict(zip(TASK_STATUSES, counts))}